@@ -0,0 +1,143 @@
+"""
+Audio conversion kernels for the Twilio <-> LiveKit media stream
+Hot-path mu-law and resampling code isolated from the webhook server
+
+These are deliberately plain module-level functions and lookup tables with no
+closures or server state, which keeps them compilable with mypyc/Cython as a
+drop-in swap. As shipped they are vectorized NumPy, so the per-frame work
+already runs inside C loops.
+"""
+
+import numpy as np
+
+# Use audioop-lts for Python 3.13+ compatibility
+try:
+    import audioop
+except ModuleNotFoundError:
+    import audioop_lts as audioop
+
+# Optional JIT: when numba is installed the decimate + mu-law encode runs as
+# one fused compiled loop; otherwise the vectorized NumPy path below is used.
+try:
+    from numba import njit
+except ModuleNotFoundError:
+    njit = None
+
+# Empty result shared by the decimator when a frame is too short to produce output
+_EMPTY_I16 = np.empty(0, dtype=np.int16)
+
+# G.711 mu-law lookup tables, generated once from audioop so the mapping stays
+# bit-exact. Indexing these with NumPy fancy-indexing converts a whole frame in
+# one vectorized gather instead of audioop's per-call dispatch, and the tables
+# (512B decode + 64KB encode) stay cache-resident.
+ULAW_DECODE_LUT = np.frombuffer(audioop.ulaw2lin(bytes(range(256)), 2), dtype=np.int16)
+ULAW_ENCODE_LUT = np.frombuffer(
+    audioop.lin2ulaw(np.arange(65536, dtype=np.uint16).view(np.int16).tobytes(), 2),
+    dtype=np.uint8,
+)
+
+
+def _design_decimation_filter(factor: int, taps: int = 48) -> np.ndarray:
+    """
+    Kaiser-windowed low-pass FIR for integer-factor decimation. The cutoff is
+    the telephone band edge (3400 Hz at the 8kHz output rate), which leaves a
+    600 Hz guard to the decimated Nyquist - enough transition width that 48
+    taps suppress aliasing, at half the MACs of a generic 0.95-Nyquist design.
+    """
+    n = np.arange(taps) - (taps - 1) / 2.0
+    cutoff = 0.85 / factor  # 3400/4000 of the decimated Nyquist
+    h = np.sinc(cutoff * n) * np.kaiser(taps, 8.6)
+    h /= h.sum()
+    return h.astype(np.float32)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _decimate_encode_kernel(x, h, factor, encode_lut, out):
+        """Fused decimating FIR + mu-law encode: one pass, zero intermediates"""
+        taps = h.shape[0]
+        for i in range(out.shape[0]):
+            base = i * factor
+            acc = np.float32(0.0)
+            for j in range(taps):
+                acc += np.float32(x[base + j]) * h[j]
+            v = int(acc)
+            if v > 32767:
+                v = 32767
+            elif v < -32768:
+                v = -32768
+            out[i] = encode_lut[v & 0xFFFF]
+
+    # Warm the JIT at import with a dummy call so the multi-second numba
+    # compile happens during process startup, never on a live frame while
+    # concurrent calls share the event loop. cache=True makes this a fast
+    # disk load on every start after the first.
+    _decimate_encode_kernel(
+        np.zeros(8, dtype=np.int16),
+        np.zeros(2, dtype=np.float32),
+        4,
+        ULAW_ENCODE_LUT,
+        np.empty(2, dtype=np.uint8),
+    )
+else:
+    _decimate_encode_kernel = None
+
+
+# Designed FIR kernels shared across streams, keyed by (src_rate, dst_rate).
+# Per-stream state is only the filter tail; the kernel itself never changes.
+_KERNEL_CACHE: dict = {}
+
+
+class PolyphaseDecimator:
+    """
+    Streaming integer-factor downsampler (e.g. LiveKit 48kHz -> Twilio 8kHz).
+    Unlike audioop.ratecv's generic rational resampler, this only computes the
+    output samples that are kept: the FIR is evaluated at every `factor`-th
+    position as one vectorized matrix-vector product. Filter tail state is
+    carried across frames so there are no boundary clicks.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int):
+        self.factor = src_rate // dst_rate
+        # Kernels are read-only and rate-pair specific, so all concurrent
+        # calls at the same rates share one cached array instead of designing
+        # (and keeping) a private copy per stream
+        key = (src_rate, dst_rate)
+        h = _KERNEL_CACHE.get(key)
+        if h is None:
+            h = _KERNEL_CACHE[key] = _design_decimation_filter(self.factor)
+        self._h = h
+        self._taps = len(h)
+        self._tail = np.zeros(self._taps - 1, dtype=np.int16)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        x = np.concatenate((self._tail, samples))
+        n_out = (len(x) - self._taps) // self.factor + 1
+        if n_out <= 0:
+            self._tail = x
+            return _EMPTY_I16
+        # Strided view: one row per retained output sample, no data copy
+        windows = np.lib.stride_tricks.sliding_window_view(x, self._taps)[::self.factor]
+        out = windows @ self._h
+        self._tail = x[n_out * self.factor:]
+        return np.clip(out, -32768, 32767).astype(np.int16)
+
+    def process_ulaw(self, samples: np.ndarray) -> bytes:
+        """
+        Decimate and mu-law encode in one step, returning G.711 bytes.
+        With numba this is a single fused compiled loop writing straight into
+        the uint8 output (no intermediate int16 frame); without it the two
+        vectorized NumPy passes are used.
+        """
+        if _decimate_encode_kernel is None:
+            pcm = self.process(samples)
+            return ULAW_ENCODE_LUT[pcm.view(np.uint16)].tobytes()
+        x = np.concatenate((self._tail, samples))
+        n_out = (len(x) - self._taps) // self.factor + 1
+        if n_out <= 0:
+            self._tail = x
+            return b""
+        out = np.empty(n_out, dtype=np.uint8)
+        _decimate_encode_kernel(x, self._h, self.factor, ULAW_ENCODE_LUT, out)
+        self._tail = x[n_out * self.factor:]
+        return out.tobytes()
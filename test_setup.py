@@ -3,9 +3,17 @@ Setup Verification Script
 Tests that all dependencies and configurations are correct
 """
 
+import functools
 import sys
 import os
 
+# Expected prefixes for credential sanity checks (name, prefix)
+PREFIX_CHECKS = (
+    ("TWILIO_ACCOUNT_SID", "AC"),
+    ("LIVEKIT_API_KEY", "API"),
+    ("OPENAI_API_KEY", "sk-"),
+)
+
 
 def test_python_version():
     """Check Python version"""
@@ -47,12 +55,21 @@ def test_imports():
     return all_ok
 
 
+@functools.cache
+def _env_stat():
+    """Stat .env once and cache the result for the rest of the run"""
+    try:
+        return os.stat('.env')
+    except FileNotFoundError:
+        return None
+
+
 def test_config():
     """Check if configuration is valid"""
     print("\n🔍 Checking configuration...")
-    
-    # Check if .env file exists
-    if not os.path.exists('.env'):
+
+    # Check if .env file exists (single cached stat instead of repeated exists())
+    if _env_stat() is None:
         print("   ✗ .env file not found")
         print("   Please create .env from env.example:")
         print("   copy env.example .env")
@@ -95,17 +112,14 @@ def test_config():
             return False
         
         print("   ✓ All required variables configured")
-        
+
         # Validate credentials format
-        if not Config.TWILIO_ACCOUNT_SID.startswith("AC"):
-            print("   ⚠️  TWILIO_ACCOUNT_SID should start with 'AC'")
-        
-        if not Config.LIVEKIT_API_KEY.startswith("API"):
-            print("   ⚠️  LIVEKIT_API_KEY should start with 'API'")
-        
-        if not Config.OPENAI_API_KEY.startswith("sk-"):
-            print("   ⚠️  OPENAI_API_KEY should start with 'sk-'")
-        
+        # Single loop over cached attrs - avoids repeated Config attribute lookups
+        cfg = Config
+        for var_name, prefix in PREFIX_CHECKS:
+            if not getattr(cfg, var_name).startswith(prefix):
+                print(f"   ⚠️  {var_name} should start with '{prefix}'")
+
         return True
         
     except Exception as e:
@@ -150,13 +164,14 @@ def main():
     print("  Summary")
     print("=" * 60)
     
-    all_passed = True
-    for test_name, passed in results:
-        status = "✓ PASS" if passed else "✗ FAIL"
-        print(f"   {test_name:20} {status}")
-        if not passed:
-            all_passed = False
-    
+    # Build the summary in one pass and emit it as a single write
+    all_passed = all(passed for _, passed in results)
+    lines = [
+        f"   {test_name:20} {'✓ PASS' if passed else '✗ FAIL'}"
+        for test_name, passed in results
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+
     print("=" * 60)
     
     if all_passed:
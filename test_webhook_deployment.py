@@ -5,8 +5,18 @@ Validates that webhook returns correct TwiML with Media Streams
 """
 
 import asyncio
-import aiohttp
-from xml.etree import ElementTree as ET
+import sys
+
+
+def _lazy_imports():
+    """
+    Import the heavy test dependencies on demand.
+    aiohttp pulls in yarl/multidict/etc. which costs noticeable startup time;
+    keeping the import out of module scope makes `--help` nearly instant.
+    """
+    global aiohttp, ET
+    import aiohttp
+    from xml.etree import ElementTree as ET
 
 
 # Configuration - UPDATE THIS for your deployment
@@ -238,6 +248,7 @@ async def test_root_endpoint():
 
 async def run_all_tests():
     """Run all tests in sequence"""
+    _lazy_imports()
     print("\n")
     print("=" * 60)
     print(" " * 10 + "MEDIA STREAMS WEBHOOK TEST SUITE")
@@ -291,9 +302,11 @@ async def run_all_tests():
     print("TEST SUMMARY")
     print("="*60)
     
-    for test_name, passed in results.items():
-        status = "✅ PASSED" if passed else "❌ FAILED"
-        print(f"{test_name.replace('_', ' ').title()}: {status}")
+    # Single buffered write instead of one print per test
+    sys.stdout.write("\n".join(
+        f"{test_name.replace('_', ' ').title()}: {'✅ PASSED' if passed else '❌ FAILED'}"
+        for test_name, passed in results.items()
+    ) + "\n")
     
     total_passed = sum(results.values())
     total_tests = len(results)
@@ -332,6 +345,7 @@ async def run_all_tests():
 
 async def run_quick_test():
     """Quick test - just health check and Media Streams TwiML"""
+    _lazy_imports()
     print("\n")
     print("=" * 60)
     print(" " * 18 + "QUICK WEBHOOK TEST")
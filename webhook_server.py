@@ -6,18 +6,24 @@ Optimized for 100+ concurrent connections with async I/O
 PERFORMANCE OPTIMIZATIONS:
 - Minimal audio conversion overhead
 - Pre-allocated buffers for zero-copy audio processing
-- Connection pooling for LiveKit rooms
 - Async I/O throughout
 - Reduced logging overhead
 """
 
 import logging
-import json
-import base64
+import orjson
+from binascii import Error as BinasciiError, a2b_base64, b2a_base64
+from base64 import urlsafe_b64encode
+from functools import lru_cache, partial
 import asyncio
+import hashlib
+import hmac
+import sys
+import time
 import numpy as np
-from typing import Dict, Optional
 from collections import deque
+from urllib.parse import parse_qsl
+from xml.sax.saxutils import escape as xml_escape
 
 # Use audioop-lts for Python 3.13+ compatibility
 try:
@@ -27,10 +33,21 @@ except ModuleNotFoundError:
     
 from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.responses import PlainTextResponse
-from livekit import api, rtc
+from livekit import rtc
 import uvicorn
 from config import Config
 
+# Install the uvloop loop policy at import so every loop in this process
+# (including the ones uvicorn creates) is uvloop, not just the one named in
+# main()'s uvicorn.run call. No-op on Windows or when uvloop is absent.
+if sys.platform != "win32":
+    try:
+        import uvloop
+        uvloop.install()
+    except ModuleNotFoundError:
+        pass
+from audio_convert import ULAW_DECODE_LUT, ULAW_ENCODE_LUT, PolyphaseDecimator
+
 # Configure minimal logging for performance
 logging.basicConfig(
     level=getattr(logging, Config.LOG_LEVEL),
@@ -45,32 +62,203 @@ app = FastAPI(
     redoc_url=None,
 )
 
-# Track active calls (thread-safe)
-active_calls = set()
+# Active-call gauge, counted per live media-stream connection: increment and
+# decrement both happen inside the one websocket handler, so they always pair
+# up within a single worker. (Counting /incoming-call against /call-status
+# does not survive multiple workers - those webhooks are separate TCP
+# connections and routinely land on different processes.) A plain int is
+# enough: one event loop per worker, and the metric is per-worker by design.
+active_call_count = 0
+
+
+def _call_started():
+    global active_call_count
+    active_call_count += 1
 
-# Audio processing buffer pool for zero-copy operations
+
+def _call_ended():
+    # Clamped at zero out of caution; the websocket finally pairs 1:1
+    global active_call_count
+    if active_call_count > 0:
+        active_call_count -= 1
+
+# Outbound message buffer pool for minimal allocation overhead. (The old
+# np.int16 half of this pool was never wired to either audio path - inbound
+# decodes into a per-stream scratch array instead - so only the bytes pool
+# that the outbound assembly actually uses remains.)
 class AudioBufferPool:
-    """Pre-allocated audio buffers for minimal allocation overhead"""
-    def __init__(self, buffer_size: int = 1024, pool_size: int = 100):
-        self.pool = deque([np.zeros(buffer_size, dtype=np.int16) for _ in range(pool_size)])
-        self.buffer_size = buffer_size
-    
-    def get_buffer(self) -> np.ndarray:
-        try:
-            return self.pool.popleft()
-        except IndexError:
-            return np.zeros(self.buffer_size, dtype=np.int16)
-    
-    def return_buffer(self, buffer: np.ndarray):
-        if len(self.pool) < 100:  # Max pool size
-            buffer.fill(0)  # Clear buffer
-            self.pool.append(buffer)
+    """Recycled bytearrays for outbound websocket message assembly"""
+    def __init__(self):
+        self.bytes_pool: deque = deque()
+
+    def get_bytes_buffer(self, size: int) -> bytearray:
+        """Bytearray of at least `size` bytes (bigger-or-equal reuse)"""
+        pool = self.bytes_pool
+        for _ in range(len(pool)):
+            buf = pool.popleft()
+            if len(buf) >= size:
+                return buf
+            pool.append(buf)
+        return bytearray(max(size, 1024))
+
+    def return_bytes_buffer(self, buffer: bytearray):
+        if len(self.bytes_pool) < 100:  # Max pool size
+            self.bytes_pool.append(buffer)
 
 # Global buffer pool for audio processing
 audio_buffer_pool = AudioBufferPool()
 
-# Connection pool for LiveKit rooms
-livekit_connection_pool: Dict[str, rtc.Room] = {}
+# LiveKit credentials bound once at import so per-call token generation does
+# repeated LOAD_FAST instead of Config attribute lookups
+_LIVEKIT_URL = Config.LIVEKIT_URL
+_LIVEKIT_API_KEY = Config.LIVEKIT_API_KEY
+_LIVEKIT_API_SECRET = Config.LIVEKIT_API_SECRET
+
+
+# Publish options are identical for every call, so build them once. A warm
+# pool of pre-connected rtc.Room objects is not possible here: the join token
+# grants exactly one room name and each call uses its own call-<sid> room, so
+# the ICE/DTLS handshake is inherently per-call.
+_PUBLISH_OPTIONS = rtc.TrackPublishOptions()
+_PUBLISH_OPTIONS.source = rtc.TrackSource.SOURCE_MICROPHONE
+
+
+# JWT pieces that never vary per call: the encoded header, and a pre-keyed
+# HMAC whose SHA-256 key schedule is amortized across calls via .copy()
+_JWT_HEADER_B64 = urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+_HMAC_BASE = hmac.new(_LIVEKIT_API_SECRET.encode(), digestmod=hashlib.sha256)
+
+
+def _phone_access_token(identity: str, room_name: str) -> str:
+    """
+    Join token for the phone participant (minimal grants), signed by hand.
+    Emits the same claims api.AccessToken(...).to_jwt() would, but the header
+    is precomputed and the HMAC key schedule reused, so per-call work on the
+    connect critical path is one orjson dump plus one SHA-256 pass.
+    """
+    now = int(time.time())
+    claims = orjson.dumps({
+        "exp": now + 21600,  # 6h, the SDK's default TTL
+        "iss": _LIVEKIT_API_KEY,
+        "nbf": now,
+        "sub": identity,
+        "name": "Phone",
+        "video": {
+            "roomJoin": True,
+            "room": room_name,
+            "canPublish": True,
+            "canSubscribe": True,
+        },
+    })
+    signing_input = _JWT_HEADER_B64 + b"." + urlsafe_b64encode(claims).rstrip(b"=")
+    mac = _HMAC_BASE.copy()
+    mac.update(signing_input)
+    signature = urlsafe_b64encode(mac.digest()).rstrip(b"=")
+    return (signing_input + b"." + signature).decode()
+
+
+class SpscRing:
+    """
+    Lock-free single-producer/single-consumer ring for the outbound audio pipe.
+    asyncio.Queue allocates futures and bookkeeping per operation; with exactly
+    one producer (the frame pump) and one consumer (the socket writer) on the
+    same event loop, a fixed slot array with monotonically increasing head/tail
+    counters plus a single wakeup Event is sufficient. Capacity must be a power
+    of two so indexing is an &-mask. When full, the oldest item is overwritten:
+    bounded audio latency beats stalling the producer.
+    """
+    __slots__ = ("_slots", "_mask", "_head", "_tail", "_event")
+
+    def __init__(self, capacity: int = 8):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self._slots = [None] * capacity
+        self._mask = capacity - 1
+        self._head = 0  # Next write position (producer only)
+        self._tail = 0  # Next read position (consumer only)
+        self._event = asyncio.Event()
+
+    def push(self, item):
+        """Producer side - never blocks, drops the oldest entry when full"""
+        if self._head - self._tail > self._mask:
+            self._slots[self._tail & self._mask] = None
+            self._tail += 1
+        self._slots[self._head & self._mask] = item
+        self._head += 1
+        self._event.set()
+
+    async def pop(self):
+        """Consumer side - waits only when the ring is empty"""
+        while self._head == self._tail:
+            self._event.clear()
+            await self._event.wait()
+        idx = self._tail & self._mask
+        item = self._slots[idx]
+        self._slots[idx] = None
+        self._tail += 1
+        return item
+
+    async def pop_all(self):
+        """
+        Consumer side - drain every pending item in one wakeup. Amortizes the
+        event-wait machinery across bursts instead of paying it per message.
+        """
+        while self._head == self._tail:
+            self._event.clear()
+            await self._event.wait()
+        items = []
+        while self._tail != self._head:
+            idx = self._tail & self._mask
+            items.append(self._slots[idx])
+            self._slots[idx] = None
+            self._tail += 1
+        return items
+
+
+# TwiML bodies precompiled as bytes templates: one %-interpolation per request
+# instead of building a fresh f-string, and returning bytes lets Starlette skip
+# the response body encode.
+_TWIML_STREAM_TEMPLATE = (
+    b'<?xml version="1.0" encoding="UTF-8"?>\n'
+    b'<Response>\n'
+    b'    <Connect>\n'
+    b'        <Stream url="%b">\n'
+    b'            <Parameter name="callSid" value="%b"/>\n'
+    b'            <Parameter name="roomName" value="%b"/>\n'
+    b'            <Parameter name="fromNumber" value="%b"/>\n'
+    b'        </Stream>\n'
+    b'    </Connect>\n'
+    b'</Response>'
+)
+
+_TWIML_ERROR_RESPONSE = (
+    b'<?xml version="1.0" encoding="UTF-8"?>\n'
+    b'<Response>\n'
+    b'    <Say voice="Polly.Joanna">Sorry, there was an error connecting your call.'
+    b' Please try again later.</Say>\n'
+    b'    <Hangup/>\n'
+    b'</Response>'
+)
+
+
+# Bounded: netloc comes from the request's Host header on an unauthenticated
+# endpoint, so an unbounded cache could be grown arbitrarily. A real
+# deployment only ever sees one or two hosts.
+@lru_cache(maxsize=8)
+def _stream_url(scheme: str, netloc: str) -> bytes:
+    """ws(s):// media-stream URL for a public host, built once per host"""
+    ws_scheme = "wss" if scheme == "https" else "ws"
+    return f"{ws_scheme}://{netloc}/media-stream".encode()
+
+
+# Outbound batching thresholds: coalesce agent audio into fewer Twilio media
+# messages to amortize JSON/base64/WebSocket-frame overhead. 480 mulaw bytes is
+# ~60ms at 8kHz; the timer bound keeps added latency under one 40ms budget.
+OUTBOUND_BATCH_BYTES = 480
+OUTBOUND_BATCH_SECONDS = 0.04
+
+# Closing bytes of a prebuilt outbound media message (see StreamState.out_prefix)
+_MEDIA_MSG_SUFFIX = b'"}}'
 
 
 @app.get("/")
@@ -79,14 +267,14 @@ async def root():
     return {
         "status": "healthy",
         "service": "Voice Agent Webhook Server",
-        "active_calls": len(active_calls)
+        "active_calls": active_call_count
     }
 
 
 @app.get("/health")
 async def health():
     """Health check for load balancers"""
-    return {"status": "ok", "active_calls": len(active_calls)}
+    return {"status": "ok", "active_calls": active_call_count}
 
 
 @app.post("/incoming-call")
@@ -96,71 +284,393 @@ async def incoming_call(request: Request):
     Uses Twilio Media Streams to connect phone audio to LiveKit room
     """
     try:
-        # Get call details from Twilio
-        form_data = await request.form()
+        # Get call details from Twilio. The body is a small urlencoded form
+        # with known fields, so parse it directly instead of going through
+        # Starlette's streaming multipart/form machinery.
+        form_data = dict(parse_qsl((await request.body()).decode()))
         call_sid = form_data.get("CallSid")
         from_number = form_data.get("From")
         to_number = form_data.get("To")
         
-        logger.info(f"📞 Incoming call: {call_sid} from {from_number} to {to_number}")
-        
-        # Track active call
-        active_calls.add(call_sid)
+        logger.info("📞 Incoming call: %s from %s to %s", call_sid, from_number, to_number)
         
         # Create a unique room name for this call
         room_name = f"call-{call_sid}"
         
-        logger.info(f"✓ Created room '{room_name}' for call {call_sid}")
-        
-        # Get the public URL for the WebSocket endpoint
-        # In production, this should be your deployed URL
-        # For local testing with ngrok, this will be your ngrok URL
-        webhook_base_url = request.url.scheme + "://" + request.url.netloc
-        # Convert http/https to ws/wss
-        if webhook_base_url.startswith('https://'):
-            stream_url = webhook_base_url.replace('https://', 'wss://') + "/media-stream"
-        else:
-            stream_url = webhook_base_url.replace('http://', 'ws://') + "/media-stream"
-        
-        logger.info(f"🔗 Stream URL: {stream_url}")
-        
-        # Create TwiML response with Media Streams
-        # This streams bidirectional audio between Twilio and our WebSocket handler
-        twiml_response = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Connect>
-        <Stream url="{stream_url}">
-            <Parameter name="callSid" value="{call_sid}"/>
-            <Parameter name="roomName" value="{room_name}"/>
-            <Parameter name="fromNumber" value="{from_number}"/>
-        </Stream>
-    </Connect>
-</Response>"""
-        
-        logger.info(f"✓ TwiML response created for {call_sid}")
-        logger.info(f"Active calls: {len(active_calls)}")
+        logger.info("✓ Created room '%s' for call %s", room_name, call_sid)
         
+        # Get the public URL for the WebSocket endpoint (deployed URL in
+        # production, the ngrok URL for local testing). A deployment only
+        # ever sees one or two hosts, so the scheme swap and string build
+        # are memoized per (scheme, netloc).
+        stream_url = _stream_url(request.url.scheme, request.url.netloc)
+
+        logger.info("🔗 Stream URL: %s", stream_url)
+
+        # Create TwiML response with Media Streams from the precompiled
+        # template. The caller number is the only externally controlled value
+        # that needs XML escaping; sids and room names are alphanumeric.
+        twiml_response = _TWIML_STREAM_TEMPLATE % (
+            stream_url,
+            (call_sid or "").encode(),
+            room_name.encode(),
+            xml_escape(from_number or "", {'"': "&quot;"}).encode(),
+        )
+
+        logger.info("✓ TwiML response created for %s", call_sid)
+        logger.info("Active calls: %d", active_call_count)
+
         return Response(
             content=twiml_response,
             media_type="application/xml"
         )
-        
+
     except Exception as e:
-        logger.error(f"❌ Error handling incoming call: {e}", exc_info=True)
-        
-        # Return error TwiML
-        error_twiml = """<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="Polly.Joanna">Sorry, there was an error connecting your call. Please try again later.</Say>
-    <Hangup/>
-</Response>"""
-        
+        logger.error("❌ Error handling incoming call: %r", e, exc_info=True)
+
         return Response(
-            content=error_twiml,
+            content=_TWIML_ERROR_RESPONSE,
             media_type="application/xml"
         )
 
 
+class StreamState:
+    """
+    Mutable per-call state shared between the websocket handler, the agent
+    audio pump and the socket writer. Defined at module scope (rather than as
+    closure cells inside media_stream) so the hot functions below are plain
+    module-level code objects that CPython's specializing interpreter can keep
+    warm across calls.
+    """
+    __slots__ = (
+        "websocket", "stream_sid", "audio_source", "resampler", "ratecv_state",
+        "pcm_scratch", "outbound_ring", "pump_tasks", "out_prefix",
+    )
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.stream_sid = None
+        self.audio_source = None
+        # Constant head of every outbound media message for this stream; the
+        # stream sid never changes, so JSON framing reduces to bytes concat
+        self.out_prefix = None
+        # Resampling state, created lazily on the first agent frame
+        self.resampler = None
+        self.ratecv_state = None
+        # Per-connection int16 scratch for inbound mulaw decode: Twilio frames
+        # are 160 samples (20ms), so one reusable buffer removes a fresh
+        # ndarray allocation per frame
+        self.pcm_scratch = np.empty(1024, dtype=np.int16)
+        # Bounded SPSC ring decoupling the LiveKit frame reader from the
+        # Twilio socket (drop-oldest on back-pressure)
+        self.outbound_ring = SpscRing(8)
+        self.pump_tasks = []
+
+
+async def twilio_writer(state: StreamState):
+    """
+    Dedicated writer draining the outbound ring to the Twilio socket.
+    Batches: one ring wakeup covers every message queued since the last drain,
+    so bursts of frames cost a single event wait plus back-to-back sends
+    (Starlette's ASGI layer owns the transport, so this is the closest
+    equivalent to buffered write-then-drain).
+    """
+    ring = state.outbound_ring
+    # One level below send_text: hand websocket.send a preformed ASGI event,
+    # skipping the wrapper frame and dict build inside send_text per message.
+    # Twilio Media Streams only accepts JSON as text frames - binary frames
+    # are discarded - so the pooled buffer's used span (all ASCII: JSON
+    # framing plus base64) is decoded to str right before the send.
+    send = state.websocket.send
+    return_buf = audio_buffer_pool.return_bytes_buffer
+    event = {"type": "websocket.send", "text": ""}
+    while True:
+        for buf, used in await ring.pop_all():
+            event["text"] = str(memoryview(buf)[:used], "ascii")
+            try:
+                await send(event)
+            except (OSError, RuntimeError):
+                return_buf(buf)
+                return  # Socket closed - the handler is tearing the call down
+            return_buf(buf)
+
+
+def _make_ulaw_converter(state: StreamState, sample_rate: int, num_channels: int):
+    """
+    Specialize the frame -> mu-law conversion once, when the first agent frame
+    reveals the track format (fixed for the call's duration). Each returned
+    closure is branch-free on the per-frame path, so rate/channel checks no
+    longer run every 20ms. runtime exec codegen would compile to the same
+    bytecode these defs already have.
+    """
+    stereo = num_channels == 2
+
+    if sample_rate != 8000 and sample_rate % 8000 == 0:
+        # Integer ratio (the LiveKit 48k -> 8k case): fused vectorized
+        # decimate + mu-law encode. frame.data supports the buffer protocol,
+        # so np.frombuffer aliases it directly - no tobytes() copy.
+        state.resampler = PolyphaseDecimator(sample_rate, 8000)
+        resampler = state.resampler
+        if stereo:
+            def convert(frame):
+                pcm = audioop.tomono(frame.data.tobytes(), 2, 1, 1)
+                return resampler.process_ulaw(np.frombuffer(pcm, dtype=np.int16))
+        else:
+            def convert(frame):
+                return resampler.process_ulaw(
+                    np.frombuffer(frame.data, dtype=np.int16)
+                )
+        return convert
+
+    if sample_rate == 8000:
+        # Already at Twilio's rate: one vectorized table gather, written into
+        # a reused per-stream scratch instead of a fresh array + tobytes()
+        ulaw_scratch = np.empty(2048, dtype=np.uint8)
+        if stereo:
+            def convert(frame):
+                pcm = np.frombuffer(
+                    audioop.tomono(frame.data.tobytes(), 2, 1, 1), dtype=np.int16
+                )
+                n = len(pcm)
+                if n > ulaw_scratch.shape[0]:
+                    return ULAW_ENCODE_LUT[pcm.view(np.uint16)].tobytes()
+                out = ulaw_scratch[:n]
+                np.take(ULAW_ENCODE_LUT, pcm.view(np.uint16), out=out)
+                return out.data  # Consumed synchronously by the += append
+        else:
+            def convert(frame):
+                pcm = np.frombuffer(frame.data, dtype=np.int16)
+                n = len(pcm)
+                if n > ulaw_scratch.shape[0]:
+                    return ULAW_ENCODE_LUT[pcm.view(np.uint16)].tobytes()
+                out = ulaw_scratch[:n]
+                np.take(ULAW_ENCODE_LUT, pcm.view(np.uint16), out=out)
+                return out.data  # Consumed synchronously by the += append
+        return convert
+
+    # Non-integer ratio: generic audioop.ratecv with carried filter state
+    def convert(frame):
+        pcm = frame.data.tobytes()
+        if stereo:
+            pcm = audioop.tomono(pcm, 2, 1, 1)
+        pcm, state.ratecv_state = audioop.ratecv(
+            pcm, 2, 1, sample_rate, 8000, state.ratecv_state
+        )
+        return ULAW_ENCODE_LUT[
+            np.frombuffer(pcm, dtype=np.int16).view(np.uint16)
+        ].tobytes()
+    return convert
+
+
+async def stream_agent_audio_to_twilio(state: StreamState, track: rtc.Track):
+    """ULTRA-LOW LATENCY audio streaming to Twilio - optimized pipeline"""
+    audio_stream = rtc.AudioStream(track)
+    out_prefix = state.out_prefix
+    ring = state.outbound_ring
+
+    # Coalesce small frames into batched media messages
+    loop = asyncio.get_running_loop()
+    pending = bytearray()
+    last_flush = loop.time()
+    prefix_len = len(out_prefix)
+    suffix_len = len(_MEDIA_MSG_SUFFIX)
+    convert = None
+
+    # No blanket try/except here: the pipeline below is pure computation
+    # (decode/resample/encode/ring push - the socket I/O lives in the writer
+    # task), so an exception means a real bug and should surface through the
+    # task rather than be swallowed frame by frame.
+    async for audio_frame_event in audio_stream:
+        frame = audio_frame_event.frame
+        if convert is None:
+            convert = _make_ulaw_converter(
+                state, frame.sample_rate, frame.num_channels
+            )
+        pending += convert(frame)
+
+        # OPTIMIZED: Batched send - one message per ~60ms of audio
+        # (or 40ms max wait) instead of one per frame. The message is
+        # assembled by splicing the base64 payload (already JSON-safe
+        # ASCII) between the prebuilt prefix/suffix - no serializer runs.
+        now = loop.time()
+        if (len(pending) >= OUTBOUND_BATCH_BYTES
+                or now - last_flush >= OUTBOUND_BATCH_SECONDS):
+            # Assemble the frame message into a pooled bytearray instead
+            # of concatenating fresh bytes; the writer returns the buffer
+            # to the pool after the send completes.
+            b64 = b2a_base64(pending, newline=False)
+            total = prefix_len + len(b64) + suffix_len
+            buf = audio_buffer_pool.get_bytes_buffer(total)
+            buf[:prefix_len] = out_prefix
+            buf[prefix_len:total - suffix_len] = b64
+            buf[total - suffix_len:total] = _MEDIA_MSG_SUFFIX
+            ring.push((buf, total))
+            pending.clear()
+            last_flush = now
+
+
+def _on_track_subscribed(state: StreamState, loop: asyncio.AbstractEventLoop,
+                         track: rtc.Track,
+                         publication: rtc.RemoteTrackPublication,
+                         participant: rtc.RemoteParticipant):
+    """
+    Module-level track handler - per-call state is bound with functools.partial
+    rather than captured in a fresh closure, so the audio pump reads plain
+    attributes on the __slots__ StreamState instead of closure cells and the
+    call site stays monomorphic for the specializing interpreter. The loop
+    handle is bound too: loop.create_task skips asyncio.create_task's
+    get_running_loop dispatch on this event hot path.
+    """
+    if track.kind == rtc.TrackKind.KIND_AUDIO:
+        state.pump_tasks.append(loop.create_task(
+            stream_agent_audio_to_twilio(state, track)
+        ))
+
+
+async def _await_start(websocket: WebSocket, state: StreamState):
+    """
+    Phase one of a media-stream connection: consume messages until Twilio's
+    one-time `start` event arrives (skipping the initial `connected` event),
+    then connect to LiveKit and wire up the call. Returns the connected room,
+    or None if the socket closed first. Keeping this out of the steady-state
+    loop means the per-frame path never re-checks for `start`.
+    """
+    while True:
+        # Raw ASGI receive: skips the receive_text wrapper (and its text-only
+        # assertion), and orjson takes str or bytes directly
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return None
+        try:
+            data = orjson.loads(message.get("bytes") or message["text"])
+            event = data["event"]
+        except (orjson.JSONDecodeError, KeyError):
+            continue  # Skip invalid messages
+        if event == "start":
+            break
+
+    # Extract call parameters - the start event's shape is fixed, so index
+    # directly instead of chaining .get() through transient default dicts
+    state.stream_sid = data["streamSid"]
+    state.out_prefix = (
+        b'{"event":"media","streamSid":"'
+        + state.stream_sid.encode()
+        + b'","media":{"payload":"'
+    )
+    custom_params = data["start"].get("customParameters") or {}
+    room_name = custom_params.get("roomName")
+    from_number = custom_params.get("fromNumber")
+
+    # Connect to LiveKit room IMMEDIATELY (token built from module-level
+    # cached credentials)
+    room = rtc.Room()
+    await room.connect(
+        _LIVEKIT_URL,
+        _phone_access_token(f"phone-{from_number}", room_name),
+    )
+
+    # From here the connected room is only reachable through this frame, so a
+    # failure (or cancellation) in the remaining setup must disconnect it
+    # before re-raising - otherwise it leaks for the token's full TTL
+    try:
+        # Create audio source - 8kHz mono for Twilio
+        state.audio_source = rtc.AudioSource(8000, 1)
+        track = rtc.LocalAudioTrack.create_audio_track("phone", state.audio_source)
+
+        # Publish track immediately (options are call-invariant, built at import)
+        await room.local_participant.publish_track(track, _PUBLISH_OPTIONS)
+
+        # Start the dedicated socket writer for this call (cancelled with the
+        # pump tasks at teardown); spawn through the cached loop handle
+        loop = asyncio.get_running_loop()
+        state.pump_tasks.append(loop.create_task(twilio_writer(state)))
+
+        # Set up OPTIMIZED event handler for agent audio (shared module-level
+        # handler with the per-call state and loop bound explicitly)
+        room.on("track_subscribed", partial(_on_track_subscribed, state, loop))
+    except BaseException:
+        await room.disconnect()
+        raise
+
+    return room
+
+
+async def _media_loop(websocket: WebSocket, state: StreamState):
+    """
+    Steady-state loop: `start` has already been handled, so per-message
+    dispatch is down to the `media`/`stop` check
+    """
+    receive = websocket.receive
+    audio_source = state.audio_source
+    pcm_scratch = state.pcm_scratch
+
+    # Reusable AudioFrame for the standard 20ms/160-sample Twilio frame:
+    # mu-law decodes straight into its buffer through a writable int16 view,
+    # and capture_frame has copied the samples into the native source by the
+    # time its await returns, so recycling the frame is safe. Odd-sized
+    # frames (first/last of a stream) fall back to a one-off frame below.
+    reuse_frame = rtc.AudioFrame(
+        data=bytearray(320), sample_rate=8000, num_channels=1,
+        samples_per_channel=160,
+    )
+    reuse_view = np.frombuffer(reuse_frame.data, dtype=np.int16)
+
+    while True:
+        message = await receive()
+        if message["type"] == "websocket.disconnect":
+            break  # Clean disconnect
+        try:
+            data = orjson.loads(message.get("bytes") or message["text"])
+            event_type = data["event"]
+        except (orjson.JSONDecodeError, KeyError):
+            continue  # Skip invalid messages
+
+        if event_type == "media":
+            # OPTIMIZED: Fast-path audio processing from phone to LiveKit.
+            # Media events have a fixed shape, so index straight into them -
+            # no .get() chain allocating default dicts per message.
+            try:
+                payload = data["media"]["payload"]
+            except KeyError:
+                continue
+            if payload:
+                try:
+                    raw = a2b_base64(payload)
+                except BinasciiError:
+                    continue  # Corrupt payload - skip the frame
+
+                # OPTIMIZED: Decode mulaw to int16 via one vectorized table
+                # gather, straight into the recycled frame's buffer on the
+                # standard 160-sample path
+                mulaw_view = np.frombuffer(raw, dtype=np.uint8)
+                n = len(mulaw_view)
+                if n == 160:
+                    np.take(ULAW_DECODE_LUT, mulaw_view, out=reuse_view)
+                    frame = reuse_frame
+                else:
+                    # Non-standard frame size: decode into the scratch buffer
+                    # and wrap a one-off frame around it
+                    if n <= pcm_scratch.shape[0]:
+                        audio_array = pcm_scratch[:n]
+                        np.take(ULAW_DECODE_LUT, mulaw_view, out=audio_array)
+                    else:
+                        audio_array = ULAW_DECODE_LUT[mulaw_view]
+                    frame = rtc.AudioFrame(
+                        data=audio_array,
+                        sample_rate=8000,
+                        num_channels=1,
+                        samples_per_channel=n
+                    )
+
+                try:
+                    await audio_source.capture_frame(frame)
+                except (OSError, RuntimeError):
+                    pass  # Room tearing down - drop the frame
+
+        elif event_type == "stop":
+            break  # Fast exit
+
+
 @app.websocket("/media-stream")
 async def media_stream(websocket: WebSocket):
     """
@@ -168,145 +678,28 @@ async def media_stream(websocket: WebSocket):
     Optimized audio pipeline with minimal conversion overhead
     """
     await websocket.accept()
-    
-    call_sid = None
-    room_name = None
+
     room = None
-    audio_source = None
-    stream_sid = None
-    
-    # Pre-allocate audio conversion state for resampling (reduces allocation overhead)
-    ratecv_state = None
-    
+    state = StreamState(websocket)
+
     try:
-        # Main event loop - optimized for speed
-        while True:
+        room = await _await_start(websocket, state)
+        if room is not None:
+            _call_started()
             try:
-                message = await websocket.receive_text()
-                data = json.loads(message)
-                event_type = data.get("event")
-                
-                if event_type == "start":
-                    # Extract call parameters - fast path
-                    stream_sid = data.get("streamSid")
-                    call_sid = data.get("start", {}).get("callSid")
-                    custom_params = data.get("start", {}).get("customParameters", {})
-                    room_name = custom_params.get("roomName")
-                    from_number = custom_params.get("fromNumber")
-                    
-                    # Connect to LiveKit room IMMEDIATELY
-                    room = rtc.Room()
-                    
-                    # Generate token (optimized - minimal grants)
-                    token = api.AccessToken(
-                        Config.LIVEKIT_API_KEY,
-                        Config.LIVEKIT_API_SECRET
-                    )
-                    token.with_identity(f"phone-{from_number}")
-                    token.with_name("Phone")
-                    token.with_grants(api.VideoGrants(
-                        room_join=True,
-                        room=room_name,
-                        can_publish=True,
-                        can_subscribe=True,
-                    ))
-                    
-                    # Connect to room - async without blocking
-                    await room.connect(Config.LIVEKIT_URL, token.to_jwt())
-                    
-                    # Create audio source - 8kHz mono for Twilio
-                    audio_source = rtc.AudioSource(8000, 1)
-                    track = rtc.LocalAudioTrack.create_audio_track("phone", audio_source)
-                    options = rtc.TrackPublishOptions()
-                    options.source = rtc.TrackSource.SOURCE_MICROPHONE
-                    
-                    # Publish track immediately
-                    await room.local_participant.publish_track(track, options)
-                    
-                    # Set up OPTIMIZED event handler for agent audio
-                    @room.on("track_subscribed")
-                    def on_track_subscribed(track: rtc.Track, publication: rtc.RemoteTrackPublication, participant: rtc.RemoteParticipant):
-                        if track.kind == rtc.TrackKind.KIND_AUDIO:
-                            asyncio.create_task(stream_agent_audio_to_twilio(track, stream_sid, websocket))
-                    
-                    async def stream_agent_audio_to_twilio(track, sid, ws):
-                        """ULTRA-LOW LATENCY audio streaming to Twilio - optimized pipeline"""
-                        nonlocal ratecv_state
-                        audio_stream = rtc.AudioStream(track)
-                        
-                        async for audio_frame_event in audio_stream:
-                            try:
-                                frame = audio_frame_event.frame
-                                pcm_data = frame.data.tobytes()
-                                
-                                # OPTIMIZED: Resample with state preservation (reduces overhead)
-                                if frame.sample_rate != 8000:
-                                    pcm_data, ratecv_state = audioop.ratecv(
-                                        pcm_data,
-                                        2,  # int16
-                                        frame.num_channels,
-                                        frame.sample_rate,
-                                        8000,
-                                        ratecv_state  # Reuse state for performance
-                                    )
-                                
-                                # OPTIMIZED: Stereo to mono conversion if needed
-                                if frame.num_channels == 2:
-                                    pcm_data = audioop.tomono(pcm_data, 2, 1, 1)
-                                
-                                # OPTIMIZED: Direct PCM to mulaw conversion
-                                mulaw_data = audioop.lin2ulaw(pcm_data, 2)
-                                
-                                # OPTIMIZED: Single-step encode and send
-                                await ws.send_text(json.dumps({
-                                    "event": "media",
-                                    "streamSid": sid,
-                                    "media": {"payload": base64.b64encode(mulaw_data).decode('ascii')}
-                                }))
-                                
-                            except Exception:
-                                pass  # Silent fail for performance
-                    
-                elif event_type == "media":
-                    # OPTIMIZED: Fast-path audio processing from phone to LiveKit
-                    if audio_source:
-                        payload = data.get("media", {}).get("payload")
-                        if payload:
-                            try:
-                                # OPTIMIZED: Decode and convert in single pipeline
-                                mulaw_data = base64.b64decode(payload)
-                                pcm_data = audioop.ulaw2lin(mulaw_data, 2)
-                                
-                                # OPTIMIZED: Direct numpy frombuffer (zero-copy)
-                                audio_array = np.frombuffer(pcm_data, dtype=np.int16)
-                                
-                                # OPTIMIZED: Direct frame creation and capture
-                                await audio_source.capture_frame(rtc.AudioFrame(
-                                    data=audio_array,
-                                    sample_rate=8000,
-                                    num_channels=1,
-                                    samples_per_channel=len(audio_array)
-                                ))
-                                
-                            except Exception:
-                                pass  # Silent fail for performance
-                
-                elif event_type == "stop":
-                    break  # Fast exit
-                    
-            except json.JSONDecodeError:
-                continue  # Skip invalid messages
-            except WebSocketDisconnect:
-                break  # Clean disconnect
-            except Exception:
-                break  # Any error - exit gracefully
-    
+                await _media_loop(websocket, state)
+            finally:
+                _call_ended()
+    except WebSocketDisconnect:
+        pass  # Clean disconnect
+    except Exception:
+        pass  # Any error - exit gracefully
     finally:
         # OPTIMIZED: Fast cleanup
+        for task in state.pump_tasks:
+            task.cancel()
         if room:
             await room.disconnect()
-        if call_sid:
-            active_calls.discard(call_sid)
 
 
 @app.post("/call-status")
@@ -316,21 +709,22 @@ async def call_status(request: Request):
     This receives updates when call state changes (completed, failed, etc.)
     """
     try:
-        form_data = await request.form()
+        # Same direct urlencoded parse as /incoming-call
+        form_data = dict(parse_qsl((await request.body()).decode()))
         call_sid = form_data.get("CallSid")
         call_status = form_data.get("CallStatus")
         
-        logger.info(f"📊 Call status update: {call_sid} - {call_status}")
+        logger.info("📊 Call status update: %s - %s", call_sid, call_status)
         
-        # Remove from active calls when completed
+        # The gauge itself tracks media-stream connections (see _call_started);
+        # this handler just logs the terminal status
         if call_status in ["completed", "failed", "busy", "no-answer", "canceled"]:
-            active_calls.discard(call_sid)
-            logger.info(f"Call ended: {call_sid}. Active calls: {len(active_calls)}")
+            logger.info("Call ended: %s. Active calls: %d", call_sid, active_call_count)
         
         return PlainTextResponse("OK")
         
     except Exception as e:
-        logger.error(f"Error handling call status: {e}", exc_info=True)
+        logger.error("Error handling call status: %r", e)
         return PlainTextResponse("OK")
 
 
@@ -340,9 +734,9 @@ async def metrics():
     Metrics endpoint for monitoring
     """
     return {
-        "active_calls": len(active_calls),
+        "active_calls": active_call_count,
         "max_concurrent_calls": Config.MAX_CONCURRENT_CALLS,
-        "utilization_percent": (len(active_calls) / Config.MAX_CONCURRENT_CALLS) * 100
+        "utilization_percent": (active_call_count / Config.MAX_CONCURRENT_CALLS) * 100
     }
 
 
@@ -385,14 +779,23 @@ def main():
         )
     else:
         # Local deployment: can use uvloop and workers
+        # One worker per core; the kernel load-balances accepted connections
+        # across worker processes (SO_REUSEPORT-style scaling). Each worker owns
+        # its calls for their lifetime, so no cross-process state is needed
+        # (active-call metrics are per-worker).
         loop_type = "uvloop" if sys.platform != "win32" else "asyncio"
+        workers = 1 if sys.platform == "win32" else (os.cpu_count() or Config.MAX_WORKERS)
         uvicorn.run(
-            app,
+            # uvicorn needs the app as an import string to spawn workers;
+            # passing the object silently disables multiprocessing
+            "webhook_server:app" if workers > 1 else app,
             host=host,
             port=port,
             log_level="warning",  # Minimal logging for performance
-            workers=1 if sys.platform == "win32" else min(Config.MAX_WORKERS, 4),
+            workers=workers,
             loop=loop_type,  # uvloop on Unix, asyncio on Windows
+            http="httptools",  # C HTTP parser (part of uvicorn[standard])
+            ws="websockets",  # C-accelerated WebSocket protocol
             access_log=False,  # Disable access logging for performance
             timeout_keep_alive=75,  # Keep connections alive
         )